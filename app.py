@@ -1,18 +1,41 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta, time
+from datetime import time
 import math
 
 # Constantes da legislação brasileira (CLT)
 FATOR_HORA_NOTURNA = 60 / 52.5  # 60 minutos reais de trabalho / 52.5 minutos de hora noturna
 INICIO_NOITE = 22
 FIM_NOITE = 5
-
-def format_timedelta(td):
-    """Formata um objeto timedelta para o formato HH:MM."""
-    total_seconds = int(td.total_seconds())
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
+MINUTOS_DIA = 24 * 60
+
+# Contagem exata da hora noturna reduzida: FATOR_HORA_NOTURNA = 60 / 52.5 = 8 / 7.
+# Em sétimos de minuto, cada minuto real diurno vale 7 unidades e cada minuto noturno vale 8,
+# o que evita o acúmulo de erro de ponto flutuante.
+UNIDADES_MINUTO_DIURNO = 7
+UNIDADES_MINUTO_NOTURNO = round(UNIDADES_MINUTO_DIURNO * FATOR_HORA_NOTURNA)
+
+# Qualquer janela de 24h contém exatamente 7h noturnas (22:00 às 05:00) e 17h diurnas
+MINUTOS_NOTURNOS_DIA = (24 - INICIO_NOITE + FIM_NOITE) * 60
+UNIDADES_DIA_COMPLETO = (MINUTOS_DIA - MINUTOS_NOTURNOS_DIA) * UNIDADES_MINUTO_DIURNO + MINUTOS_NOTURNOS_DIA * UNIDADES_MINUTO_NOTURNO
+
+# Parâmetros da semana conforme a quantidade de dias de trabalho
+REGIME_SEMANAL = {
+    5: {"dias": ("Segunda", "Terça", "Quarta", "Quinta", "Sexta"), "dias_uteis": 22},
+    6: {"dias": ("Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado"), "dias_uteis": 26},
+}
+
+# Nota exibida abaixo dos resultados
+_NOTA_HORA_NOTURNA = """
+---
+### ⚠️ Nota sobre Hora Noturna Reduzida
+A jornada de saída é calculada de forma dinâmica. Se o horário de trabalho (líquido) se estender para o período entre **22:00 e 05:00**, a cada **52 minutos e 30 segundos** reais de trabalho é contabilizado **1 hora** na contagem da jornada (**Hora Ficta**).
+
+* **Intervalo:** O horário de intervalo é inserido na simulação após o acúmulo de 4 horas de trabalho efetivo.
+"""
+
+def format_minutes(minutos: float) -> str:
+    """Formata uma quantidade de minutos no formato HHh MMm (frações de minuto são descartadas)."""
+    hours, minutes = divmod(int(minutos), 60)
     return f"{hours:02d}h {minutes:02d}m"
 
 def parse_time_to_minutes(time_str: str) -> int:
@@ -21,14 +44,10 @@ def parse_time_to_minutes(time_str: str) -> int:
     if not time_str:
         return 0
     
-    if ':' in time_str:
-        parts = time_str.split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-    else:
-        hours = int(time_str)
-        minutes = 0
-    return hours * 60 + minutes
+    # partition não aloca lista e devolve separador vazio quando não há ':'
+    # (campos após um segundo ':', como segundos, são ignorados)
+    hours, sep, rest = time_str.partition(':')
+    return int(hours) * 60 + (int(rest.partition(':')[0]) if sep else 0)
 
 def parse_input_to_time(time_input: str) -> time | None:
     """Tenta converter uma string de entrada (HH:MM ou HH) para um objeto time."""
@@ -37,13 +56,9 @@ def parse_input_to_time(time_input: str) -> time | None:
         return None
         
     try:
-        if ':' in time_input:
-            parts = time_input.split(':')
-            hour = int(parts[0])
-            minute = int(parts[1])
-        else:
-            hour = int(time_input)
-            minute = 0
+        hour_str, sep, rest = time_input.partition(':')
+        hour = int(hour_str)
+        minute = int(rest.partition(':')[0]) if sep else 0
             
         # Garante que a hora e o minuto estejam dentro de limites válidos
         if 0 <= hour <= 23 and 0 <= minute <= 59:
@@ -56,143 +71,219 @@ def parse_input_to_time(time_input: str) -> time | None:
     except Exception:
         return None
 
-def time_to_datetime(t, date_offset=0):
-    """Converte time para datetime (usando uma data base) e adiciona um offset de dia se necessário."""
-    # Usamos uma data base fixa para cálculos
-    base_date = datetime(2023, 1, 1) + timedelta(days=date_offset)
-    return base_date.replace(hour=t.hour, minute=t.minute, second=0, microsecond=0)
+def _format_hhmm(minuto: int) -> str:
+    """Formata minutos contados a partir da meia-noite do dia base como relógio HH:MM."""
+    return f"{minuto // 60 % 24:02d}:{minuto % 60:02d}"
+
+def _day_offset_suffix(minuto: int) -> str:
+    """Retorna o sufixo ' (+ND)' quando o minuto cai N dias após o dia base, ou '' no próprio dia."""
+    dias = minuto // MINUTOS_DIA
+    return f" (+{dias}D)" if dias > 0 else ""
+
+def _night_segment_end(minuto: int) -> tuple[int, bool]:
+    """
+    Retorna o fim do trecho diurno ou noturno que contém o minuto informado
+    (minutos contados a partir da meia-noite do dia base) e se esse trecho é noturno.
+    """
+    inicio_dia = minuto - minuto % MINUTOS_DIA
+    minuto_do_dia = minuto % MINUTOS_DIA
+
+    if minuto_do_dia < FIM_NOITE * 60:
+        return inicio_dia + FIM_NOITE * 60, True
+    if minuto_do_dia < INICIO_NOITE * 60:
+        return inicio_dia + INICIO_NOITE * 60, False
+    return inicio_dia + MINUTOS_DIA + FIM_NOITE * 60, True
+
+def _night_minutes_in_range(a: int, b: int) -> int:
+    """
+    Conta os minutos noturnos (22:00 às 05:00) no intervalo [a, b), com os minutos
+    contados a partir da meia-noite do dia base.
+    """
+    noturnos = 0
+    for dia in range(a // MINUTOS_DIA, b // MINUTOS_DIA + 1):
+        inicio_dia = dia * MINUTOS_DIA
+        # Madrugada (00:00 às 05:00) e noite (22:00 às 24:00) de cada dia
+        noturnos += max(0, min(b, inicio_dia + FIM_NOITE * 60) - max(a, inicio_dia))
+        noturnos += max(0, min(b, inicio_dia + MINUTOS_DIA) - max(a, inicio_dia + INICIO_NOITE * 60))
+    return noturnos
+
+def _minutes_to_reach(inicio: int, alvo_unidades: float) -> tuple[int, int]:
+    """
+    Calcula quantos minutos reais, a partir de `inicio`, são necessários para acumular
+    `alvo_unidades` unidades de jornada (sétimos de minuto), aplicando a hora noturna reduzida.
 
-def calculate_exit_time(entrada: time, intervalo_minutos: int, jornada_diaria_minutos: float) -> tuple:
+    Retorna: (minutos_reais, unidades_acumuladas)
+    """
+    atual = inicio
+    unidades = 0
+
+    # Dias completos são pulados de uma vez, deixando ao menos um dia para o percurso por trechos:
+    # o custo não cresce com a jornada (o laço abaixo faz no máximo poucas iterações)
+    dias_completos = int(alvo_unidades // UNIDADES_DIA_COMPLETO) - 1
+    if dias_completos > 0:
+        atual += dias_completos * MINUTOS_DIA
+        unidades += dias_completos * UNIDADES_DIA_COMPLETO
+
+    while True:
+        fim_trecho, is_night_time = _night_segment_end(atual)
+        taxa = UNIDADES_MINUTO_NOTURNO if is_night_time else UNIDADES_MINUTO_DIURNO
+        duracao = fim_trecho - atual
+
+        if unidades + duracao * taxa >= alvo_unidades:
+            # Último trecho: resolve a equação e arredonda para o minuto cheio seguinte
+            duracao = math.ceil((alvo_unidades - unidades) / taxa)
+            return atual + duracao - inicio, unidades + duracao * taxa
+
+        unidades += duracao * taxa
+        atual = fim_trecho
+
+@st.cache_data(max_entries=128)
+def calculate_exit_time(entrada: time, intervalo_minutos: int, jornada_diaria_unidades: float) -> tuple:
     """
     Calcula o horário de saída considerando a hora noturna reduzida e o intervalo.
+    A jornada diária é informada em unidades (sétimos de minuto efetivo), para que metas vindas
+    de divisões (ex: Short Friday) não acumulem erro de ponto flutuante.
+    Função pura (sem chamadas ao Streamlit): o resultado fica em cache entre as execuções do
+    Streamlit e os erros são tratados em main().
 
     Retorna: (saída, intervalo_str, jornada_liquida_formatada)
     """
-    try:
-        # 1. Preparação dos tempos
-        t_entrada = time_to_datetime(entrada)
-        t_intervalo = timedelta(minutes=intervalo_minutos)
-        jornada_liquida_target_td = timedelta(minutes=jornada_diaria_minutos)
-        
-        # 2. Simulação minuto a minuto (ajustada para eficiência)
-        
-        current_dt = t_entrada
-        
-        real_minutes_worked = 0
-        effective_minutes_worked = 0.0
-        
-        intervalo_start_dt = None
-        
-        # O loop simula o tempo real que passa
-        while effective_minutes_worked < jornada_diaria_minutos:
-            # Ponto de parada de segurança
-            if real_minutes_worked > 2000: # 33 horas, limite seguro
-                break
+    # 0. Validação das entradas (os erros são exibidos por main())
+    if intervalo_minutos < 0:
+        raise ValueError("o intervalo não pode ser negativo.")
+    if jornada_diaria_unidades < 0:
+        raise ValueError("a jornada diária não pode ser negativa.")
+
+    # 1. Preparação dos tempos (posições em minutos a partir da meia-noite do dia da entrada)
+    intervalo_formatado = format_minutes(intervalo_minutos)
+    
+    # 2. Cálculo por segmentos diurnos/noturnos (sem simulação minuto a minuto)
+    inicio_minutos = entrada.hour * 60 + entrada.minute
+    intervalo_inicio_minutos = None
+
+    # Contagem em unidades (sétimos de minuto efetivo)
+    target_units = jornada_diaria_unidades
+
+    # Trabalha até 4 horas (240 minutos) efetivas se houver intervalo, ou direto até o fim da jornada
+    primeiro_trecho = min(240 * UNIDADES_MINUTO_DIURNO, target_units) if intervalo_minutos > 0 else target_units
+    real_minutes_worked, eff_units = _minutes_to_reach(inicio_minutos, primeiro_trecho)
+
+    if eff_units < target_units:
+        # 3. Inserção do Intervalo: inserido UMA VEZ, após 4 horas de trabalho efetivo
+        intervalo_inicio_minutos = inicio_minutos + real_minutes_worked
+        real_minutes_worked += intervalo_minutos
+
+        # 4. Contabiliza o restante da jornada após o intervalo
+        restante_real, _ = _minutes_to_reach(
+            inicio_minutos + real_minutes_worked,
+            target_units - eff_units
+        )
+        real_minutes_worked += restante_real
 
-            current_hour = current_dt.hour
-            
-            # Início do período noturno (22:00)
-            is_night_start = (current_hour >= INICIO_NOITE) 
-            # Fim do período noturno (05:00) (considera o ciclo 00:00-05:00)
-            is_night_end = (current_hour < FIM_NOITE)
+    # 5. Define o horário de saída
+    saida_minutos = inicio_minutos + real_minutes_worked
 
-            is_night_time = is_night_start or is_night_end
-            
-            # 3. Inserção do Intervalo: Assumimos que o intervalo começa após 4 horas (240 minutos) de trabalho efetivo,
-            # e garante que o intervalo só seja inserido UMA VEZ.
-            if effective_minutes_worked >= 240 and intervalo_start_dt is None and intervalo_minutos > 0:
-                intervalo_start_dt = current_dt
-                current_dt += t_intervalo
-                real_minutes_worked += intervalo_minutos
-                # Pula o restante do loop e continua a simulação do trabalho
-                continue
-
-            # 4. Contabiliza o minuto de trabalho (real e efetivo)
-            if is_night_time:
-                # Hora Noturna Reduzida: 1 minuto real conta como 1.1428 minutos efetivos
-                effective_minutes_worked += FATOR_HORA_NOTURNA
-            else:
-                # Hora Diurna: 1 minuto real conta como 1 minuto efetivo
-                effective_minutes_worked += 1
-                
-            # Avança 1 minuto real
-            current_dt += timedelta(minutes=1)
-            real_minutes_worked += 1
-            
-        # 5. Define o horário de saída
-        saida_dt = current_dt
-
-        # 6. Define o início e fim do intervalo para exibição
-        if intervalo_start_dt:
-            intervalo_fim_dt = intervalo_start_dt + t_intervalo
-            intervalo_inicio_str = intervalo_start_dt.strftime("%H:%M")
-            intervalo_fim_str = intervalo_fim_dt.strftime("%H:%M")
-            # Verifica se o fim do intervalo é no dia seguinte para a exibição (ex: 01:00)
-            if intervalo_fim_dt < intervalo_start_dt:
-                intervalo_fim_str += " (+1D)"
-                
-            intervalo_str = f"{intervalo_inicio_str} - {intervalo_fim_str} ({format_timedelta(t_intervalo)})"
-        else:
-            intervalo_str = format_timedelta(t_intervalo)
+    # 6. Define o início e fim do intervalo para exibição
+    if intervalo_inicio_minutos is not None:
+        intervalo_fim_minutos = intervalo_inicio_minutos + intervalo_minutos
+        # Início e fim indicam cada um o seu dia em relação à entrada (ex: 01:30 (+1D) - 02:30 (+1D))
+        intervalo_inicio_str = _format_hhmm(intervalo_inicio_minutos) + _day_offset_suffix(intervalo_inicio_minutos)
+        intervalo_fim_str = _format_hhmm(intervalo_fim_minutos) + _day_offset_suffix(intervalo_fim_minutos)
 
-        # 7. Verifica se a saída é no dia seguinte
-        if saida_dt < t_entrada:
-            saida_str = saida_dt.strftime("%H:%M") + " (+1D)"
-        else:
-            saida_str = saida_dt.strftime("%H:%M")
-             
-        jornada_liquida_formatada = format_timedelta(timedelta(minutes=jornada_diaria_minutos))
+        intervalo_str = f"{intervalo_inicio_str} - {intervalo_fim_str} ({intervalo_formatado})"
+    else:
+        intervalo_str = intervalo_formatado
 
-        return saida_str, intervalo_str, jornada_liquida_formatada
+    # 7. Indica se a saída é no dia seguinte (ou além, em jornadas acima de 24h)
+    saida_str = _format_hhmm(saida_minutos) + _day_offset_suffix(saida_minutos)
+         
+    jornada_liquida_formatada = format_minutes(jornada_diaria_unidades / UNIDADES_MINUTO_DIURNO)
 
-    except Exception as e:
-        st.error(f"Ocorreu um erro no cálculo: {e}")
-        return "Erro", "Erro", "Erro"
+    return saida_str, intervalo_str, jornada_liquida_formatada
 
-def calculate_short_friday_net_minutes(entrada: time, saida: time, intervalo_minutos: int) -> float:
+@st.cache_data(max_entries=128)
+def calculate_short_friday_net_units(entrada: time, saida: time, intervalo_minutos: int) -> int:
     """
-    Calcula os minutos líquidos efetivos trabalhados na Sexta, dado o horário de entrada, saída e intervalo.
-    Este cálculo é necessário para redistribuir a jornada restante para Seg-Qui.
+    Calcula a jornada líquida efetiva da Sexta, em unidades (sétimos de minuto efetivo), dado o
+    horário de entrada, saída e intervalo.
+    Este cálculo é necessário para redistribuir a jornada restante para Seg-Qui; o valor inteiro
+    evita erro de arredondamento nessa redistribuição.
     """
-    t_entrada = time_to_datetime(entrada)
-    t_saida = time_to_datetime(saida)
+    # Minutos contados a partir da meia-noite do dia da entrada
+    inicio_minutos = entrada.hour * 60 + entrada.minute
+    saida_minutos = saida.hour * 60 + saida.minute
     
     # Se a saída for antes da entrada, assume-se que é no dia seguinte (e.g., turno noturno)
-    if t_saida <= t_entrada:
-        t_saida += timedelta(days=1)
-
-    t_intervalo = timedelta(minutes=intervalo_minutos)
-    
-    current_dt = t_entrada
-    real_minutes_worked = 0
-    effective_minutes_worked = 0.0
-    intervalo_applied = False
+    if saida_minutos <= inicio_minutos:
+        saida_minutos += MINUTOS_DIA
     
-    while current_dt < t_saida:
-        # Ponto de aplicação do Intervalo (após 4 horas reais)
-        if real_minutes_worked >= 240 and not intervalo_applied and intervalo_minutos > 0:
-            current_dt += t_intervalo
-            real_minutes_worked += intervalo_minutos
-            intervalo_applied = True
-            if current_dt >= t_saida:
-                break # Saiu durante o intervalo
-        
-        if current_dt >= t_saida:
-            break # Parar de contar minutos se já passou da hora de saída
+    # Intervalo aplicado após 4 horas reais, se a saída for depois desse ponto
+    if intervalo_minutos > 0 and saida_minutos - inicio_minutos > 240:
+        trechos = ((inicio_minutos, inicio_minutos + 240), (inicio_minutos + 240 + intervalo_minutos, saida_minutos))
+    else:
+        trechos = ((inicio_minutos, saida_minutos),)
 
-        current_hour = current_dt.hour
-        is_night_time = (current_hour >= INICIO_NOITE) or (current_hour < FIM_NOITE)
+    eff_units = 0
+    for inicio_trecho, fim_trecho in trechos:
+        if fim_trecho <= inicio_trecho:
+            continue # Saiu durante o intervalo
+        # Cada minuto noturno vale uma unidade a mais que o diurno
+        eff_units += UNIDADES_MINUTO_DIURNO * (fim_trecho - inicio_trecho)
+        eff_units += (UNIDADES_MINUTO_NOTURNO - UNIDADES_MINUTO_DIURNO) * _night_minutes_in_range(inicio_trecho, fim_trecho)
 
-        if is_night_time:
-            # Hora Noturna Reduzida
-            effective_minutes_worked += FATOR_HORA_NOTURNA
-        else:
-            effective_minutes_worked += 1
-            
-        current_dt += timedelta(minutes=1)
-        real_minutes_worked += 1
+    return eff_units
+
+
+def build_standard_week_table(entrada: time, intervalo_minutos: int, jornada_diaria_unidades: float, dias_trabalho_semana: int) -> dict:
+    """
+    Monta as colunas da tabela da Jornada Padrão (Semanal).
+    Sem cache próprio: o cálculo em si já fica em cache em calculate_exit_time, como nos demais regimes.
+    """
+    dias = list(REGIME_SEMANAL[dias_trabalho_semana]["dias"])
+
+    # Mesmo resultado para todos os dias
+    saida, intervalo_str, jornada_diaria_str = calculate_exit_time(
+        entrada, 
+        intervalo_minutos, 
+        jornada_diaria_unidades
+    )
+
+    # Todas as colunas exceto "Dia" são constantes: repete o mesmo valor para cada dia
+    n = len(dias)
+    entrada_str = f"{entrada.hour:02d}:{entrada.minute:02d}"
+    return {
+        "Dia": dias,
+        "Entrada": [entrada_str] * n,
+        "Intervalo": [intervalo_str] * n,
+        "Saída": [saida] * n,
+        "Jornada Diária (Líquida)": [jornada_diaria_str] * n,
+        "Descanso Após Jornada": ["11h (Mínimo CLT)"] * n
+    }
+
+
+def build_monthly_summary(regime_trabalho: str, total_semanal_minutos_target: int, dias_trabalho_semana: int) -> tuple:
+    """
+    Monta os textos do Resumo Mensal, que dependem apenas do regime e da carga semanal.
+
+    Retorna: (total_semanal_str, total_mensal_horas_clt, col1_caption, col2_caption, col3_caption)
+    """
+    if regime_trabalho == "Regime 12x36":
+        total_semanal_str = "Aprox. 42h00m"
+        total_mensal_horas_clt = 180 
+        col1_caption = "A jornada média semanal é de 42h, considerando 3.5 turnos de 12h."
+        col2_caption = "Valor de referência para cálculo de salário (CLT: 180h/mês)."
+        col3_caption = "Média aproximada de dias TRABALHADOS no mês."
+    else:
+        # Padrão Semanal e Short Friday
+        total_semanal_str = format_minutes(total_semanal_minutos_target)
+        # Cálculo baseado em semanas comerciais (aprox. 5 semanas/mês)
+        total_mensal_horas_clt = round(total_semanal_minutos_target / 60 * 5)
         
-    return effective_minutes_worked
+        col1_caption = f"Jornada informada pelo usuário. Limite legal é de 44 horas."
+        col2_caption = f"Referência CLT: {total_mensal_horas_clt}h/mês (5 semanas x {total_semanal_str})."
+        col3_caption = f"Dias de trabalho por semana: {dias_trabalho_semana}."
+
+    return total_semanal_str, total_mensal_horas_clt, col1_caption, col2_caption, col3_caption
 
 
 def main():
@@ -216,6 +307,10 @@ def main():
         index=0
     )
 
+    # Os demais parâmetros ficam em um formulário: o Streamlit só reexecuta o script no envio,
+    # e não a cada edição. O regime fica fora porque define quais campos aparecem.
+    form = st.sidebar.form("jornada_params")
+
     jornada_padrao_minutos = 0 # Inicialização: Jornada diária se fosse dividida igualmente
     jornada_texto = ""
     total_semanal_minutos_target = 0
@@ -223,13 +318,13 @@ def main():
     dias_uteis_no_mes = 0
     is_short_friday = regime_trabalho == "Short Friday (Sexta Curta)"
     saida_sexta_time = None
-    jornada_sexta_minutos = 0 # Usado apenas para Short Friday
+    jornada_sexta_unidades = 0 # Usado apenas para Short Friday
 
     if is_short_friday:
         # Short Friday (Sexta Curta) logic
         
         # 1. Base Semanal (Sexta Curta sempre assume 5 dias úteis)
-        jornada_semanal_str = st.sidebar.text_input(
+        jornada_semanal_str = form.text_input(
             "Carga Horária Semanal (Base: 44, 40, etc.):",
             "44",
             key="jornada_semanal_base_str"
@@ -238,17 +333,19 @@ def main():
             total_semanal_minutos_target = parse_time_to_minutes(jornada_semanal_str)
             if total_semanal_minutos_target <= 0: raise ValueError
             jornada_padrao_minutos = total_semanal_minutos_target / 5 # Base diária antes da compensação
-            jornada_texto = format_timedelta(timedelta(minutes=jornada_padrao_minutos))
+            jornada_texto = format_minutes(jornada_padrao_minutos)
         except:
+             # Sem return aqui: o formulário precisa chegar ao botão de envio
              st.error("Formato de jornada semanal inválido para Short Friday.")
-             return
+             jornada_texto = "Jornada inválida"
+             total_semanal_minutos_target = 0
              
         dias_trabalho_semana = 5
-        dias_uteis_no_mes = 22
+        dias_uteis_no_mes = REGIME_SEMANAL[dias_trabalho_semana]["dias_uteis"]
         
         # 2. Entrada específica da Sexta (mesmo campo de entrada geral, mas validado aqui)
-        st.sidebar.markdown("---")
-        saida_sexta_str = st.sidebar.text_input(
+        form.markdown("---")
+        saida_sexta_str = form.text_input(
             "Horário de Saída na Sexta (HH:MM ou HH):",
             "14:00",
             key="saida_sexta_str"
@@ -259,15 +356,15 @@ def main():
 
     elif regime_trabalho == "Jornada Padrão (Semanal)":
         # 1. Jornada Semanal
-        jornada_semanal_str = st.sidebar.text_input(
+        jornada_semanal_str = form.text_input(
             "Carga Horária Semanal (Ex: 44, 40, 42:30):",
             "44",
             key="jornada_semanal_str"
         )
         # 2. Dias Trabalhados
-        dias_trabalho_semana = st.sidebar.selectbox(
+        dias_trabalho_semana = form.selectbox(
             "Dias de Trabalho na Semana:",
-            options=[5, 6],
+            options=list(REGIME_SEMANAL),
             index=0,
             format_func=lambda x: f"{x} dias/semana",
             key="dias_trabalho_semana"
@@ -277,14 +374,14 @@ def main():
             total_semanal_minutos_target = parse_time_to_minutes(jornada_semanal_str)
             if total_semanal_minutos_target > 0 and dias_trabalho_semana > 0:
                 jornada_padrao_minutos = total_semanal_minutos_target / dias_trabalho_semana
-                jornada_texto = format_timedelta(timedelta(minutes=jornada_padrao_minutos))
+                jornada_texto = format_minutes(jornada_padrao_minutos)
             else:
                  jornada_texto = "Jornada inválida"
                  total_semanal_minutos_target = 0
         except:
             jornada_padrao_minutos = 0
             
-        dias_uteis_no_mes = 22 if dias_trabalho_semana == 5 else 26
+        dias_uteis_no_mes = REGIME_SEMANAL[dias_trabalho_semana]["dias_uteis"]
 
     else: # Regime 12x36
         dias_trabalho_semana = 7 
@@ -293,19 +390,20 @@ def main():
         total_semanal_minutos_target = 42 * 60 # Média de 42h
         dias_uteis_no_mes = 15 
 
-    st.sidebar.markdown(f"**Jornada Diária Líquida Estimada:** **{jornada_texto}**")
-
-
     # 3. Intervalo (Aplica-se a todos)
+    # Limites fixos e key estável: se dependessem da carga semanal (campo do mesmo formulário),
+    # o Streamlit recriaria o slider no envio e descartaria o valor escolhido.
+    # O mínimo legal é validado após o envio.
     min_intervalo = 1.0 if jornada_padrao_minutos >= 360 else 0.5 
     
-    intervalo_horas = st.sidebar.slider(
+    intervalo_horas = form.slider(
         "Horas de Intervalo (Refeição/Descanso):",
-        min_value=min_intervalo, 
+        min_value=0.5, 
         max_value=2.0, 
-        value=min_intervalo, 
+        value=1.0, 
         step=0.5,
-        format="%.1f h"
+        format="%.1f h",
+        key="intervalo_horas"
     )
     intervalo_minutos = int(intervalo_horas * 60)
     
@@ -314,14 +412,18 @@ def main():
     if regime_trabalho == "Regime 12x36":
         entrada_default_str = "19:00" 
     
-    entrada_str = st.sidebar.text_input(
+    entrada_str = form.text_input(
         "Horário de Entrada (HH:MM ou HH):",
         entrada_default_str,
         key="entrada_str"
     )
     
-    # Botão de Cálculo
-    calcular_button = st.sidebar.button("Calcular Jornada", type="primary")
+    # Botão de Cálculo (envia o formulário)
+    calcular_button = form.form_submit_button("Calcular Jornada", type="primary")
+
+    # Fora do formulário: calculada a partir dos valores do último envio
+    st.sidebar.markdown(f"**Jornada Diária Líquida Estimada:** **{jornada_texto}**")
+    st.sidebar.caption("Atualizada ao clicar em Calcular Jornada.")
 
 
     # --- Bloco de Cálculo Condicional ---
@@ -333,37 +435,33 @@ def main():
         if entrada is None:
             st.error("Horário de Entrada inválido. Use o formato HH:MM (ex: 08:00) ou apenas HH (ex: 14).")
             return
+
+        # Texto da entrada exibido na tabela, formatado uma única vez por clique
+        entrada_disp = f"{entrada.hour:02d}:{entrada.minute:02d}"
             
         # Revalidação de inputs críticos antes do cálculo principal
         if total_semanal_minutos_target <= 0:
             st.error("Por favor, insira uma jornada semanal válida antes de calcular. Verifique a Carga Horária Semanal.")
             return
 
-        data = []
-        
+        # Intervalo mínimo: 1h para jornadas a partir de 6h diárias (Art. 71, CLT)
+        if intervalo_horas < min_intervalo:
+            st.error(f"O intervalo mínimo para esta jornada é de {min_intervalo:.1f} h (Art. 71, CLT). Ajuste as Horas de Intervalo.")
+            return
+
+        # Tabela montada por colunas (dict de listas) em todos os regimes
         if regime_trabalho == "Jornada Padrão (Semanal)":
-            dias = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta"]
-            if dias_trabalho_semana == 6:
-                dias.append("Sábado")
-            
-            # Jornada diária é a jornada padrão calculada no início
-            shift_minutes = jornada_padrao_minutos
-            
-            for dia in dias:
-                saida, intervalo_str, jornada_diaria_str = calculate_exit_time(
+            # Jornada diária é a jornada padrão, em unidades calculadas direto da carga semanal
+            try:
+                data = build_standard_week_table(
                     entrada, 
                     intervalo_minutos, 
-                    shift_minutes
+                    UNIDADES_MINUTO_DIURNO * total_semanal_minutos_target / dias_trabalho_semana, 
+                    dias_trabalho_semana
                 )
-                
-                data.append({
-                    "Dia": dia,
-                    "Entrada": entrada.strftime("%H:%M"),
-                    "Intervalo": intervalo_str,
-                    "Saída": saida,
-                    "Jornada Diária (Líquida)": jornada_diaria_str,
-                    "Descanso Após Jornada": "11h (Mínimo CLT)"
-                })
+            except ValueError as e:
+                st.error(f"Ocorreu um erro no cálculo: {e}")
+                return
                 
         elif is_short_friday:
             
@@ -371,119 +469,102 @@ def main():
                 st.error("Por favor, informe e valide o Horário de Saída na Sexta.")
                 return
 
-            # 1. Cálculo dos minutos efetivos trabalhados na Sexta (Jornada Fixa)
-            jornada_sexta_minutos = calculate_short_friday_net_minutes(
+            # 1. Cálculo da jornada efetiva trabalhada na Sexta (Jornada Fixa), em unidades
+            jornada_sexta_unidades = calculate_short_friday_net_units(
                 entrada, 
                 saida_sexta_time, 
                 intervalo_minutos
             )
             
-            # 2. Redistribuição para Seg-Qui
-            minutes_needed_for_mon_to_thu = total_semanal_minutos_target - jornada_sexta_minutos
+            # 2. Redistribuição para Seg-Qui (em unidades inteiras, dividindo só no fim)
+            units_needed_for_mon_to_thu = UNIDADES_MINUTO_DIURNO * total_semanal_minutos_target - jornada_sexta_unidades
             
-            if minutes_needed_for_mon_to_thu < 0:
+            if units_needed_for_mon_to_thu < 0:
                  st.error("A jornada de Sexta Curta informada excede a Carga Horária Semanal total. Por favor, ajuste a Saída na Sexta.")
                  return
                  
-            jornada_seg_a_qui_minutos = minutes_needed_for_mon_to_thu / 4
+            jornada_seg_a_qui_unidades = units_needed_for_mon_to_thu / 4
+            jornada_seg_a_qui_minutos = jornada_seg_a_qui_unidades / UNIDADES_MINUTO_DIURNO
             
             # Limite legal de 10 horas diárias (8h normais + 2h extras compensatórias)
-            if jornada_seg_a_qui_minutos > (10 * 60): 
-                st.error(f"A jornada de Segunda a Quinta ({format_timedelta(timedelta(minutes=jornada_seg_a_qui_minutos))}) excede o limite legal de 10 horas diárias (Art. 59, CLT).")
+            if jornada_seg_a_qui_unidades > 10 * 60 * UNIDADES_MINUTO_DIURNO: 
+                st.error(f"A jornada de Segunda a Quinta ({format_minutes(jornada_seg_a_qui_minutos)}) excede o limite legal de 10 horas diárias (Art. 59, CLT).")
                 return
 
 
             # 3. População da Tabela
-            dias = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta"]
+            dias = REGIME_SEMANAL[dias_trabalho_semana]["dias"]
             
-            t_entrada_base = time_to_datetime(entrada)
-
-            for dia in dias:
-                if dia != "Sexta":
-                    # Days Mon-Thu use the redistributed hours
-                    saida, intervalo_str, jornada_diaria_str = calculate_exit_time(
-                        entrada, 
-                        intervalo_minutos, 
-                        jornada_seg_a_qui_minutos
-                    )
-                else:
-                    # Friday uses the fixed exit time and already calculated net time
-                    saida_sexta_str_display = saida_sexta_time.strftime("%H:%M")
-                    # Check if Friday exit is next day (e.g., entry 22:00, exit 01:00)
-                    t_saida_sexta_check = time_to_datetime(saida_sexta_time)
-                    if t_saida_sexta_check <= t_entrada_base:
-                         saida_sexta_str_display += " (+1D)"
-                        
-                    intervalo_str = format_timedelta(timedelta(minutes=intervalo_minutos))
-                    saida = saida_sexta_str_display
-                    jornada_diaria_str = format_timedelta(timedelta(minutes=jornada_sexta_minutos))
-                    
-                data.append({
-                    "Dia": dia,
-                    "Entrada": entrada.strftime("%H:%M"),
-                    "Intervalo": intervalo_str,
-                    "Saída": saida,
-                    "Jornada Diária (Líquida)": jornada_diaria_str,
-                    "Descanso Após Jornada": "11h (Mínimo CLT)"
-                })
+            # Days Mon-Thu use the redistributed hours (same result for all four days)
+            try:
+                saida_seg_a_qui, intervalo_seg_a_qui_str, jornada_seg_a_qui_str = calculate_exit_time(
+                    entrada, 
+                    intervalo_minutos, 
+                    jornada_seg_a_qui_unidades
+                )
+            except ValueError as e:
+                st.error(f"Ocorreu um erro no cálculo: {e}")
+                return
+
+            # Friday uses the fixed exit time and already calculated net time
+            saida_sexta_str_display = f"{saida_sexta_time.hour:02d}:{saida_sexta_time.minute:02d}"
+            # Check if Friday exit is next day (e.g., entry 22:00, exit 01:00)
+            if saida_sexta_time <= entrada:
+                 saida_sexta_str_display += " (+1D)"
+
+            # Seg-Qui repetem o mesmo resultado; a Sexta é a última linha
+            n_seg_a_qui = len(dias) - 1
+            data = {
+                "Dia": list(dias),
+                "Entrada": [entrada_disp] * len(dias),
+                "Intervalo": [intervalo_seg_a_qui_str] * n_seg_a_qui + [format_minutes(intervalo_minutos)],
+                "Saída": [saida_seg_a_qui] * n_seg_a_qui + [saida_sexta_str_display],
+                "Jornada Diária (Líquida)": [jornada_seg_a_qui_str] * n_seg_a_qui + [format_minutes(jornada_sexta_unidades / UNIDADES_MINUTO_DIURNO)],
+                "Descanso Após Jornada": ["11h (Mínimo CLT)"] * len(dias)
+            }
 
 
         else: # Regime 12x36
             # Simula 4 dias de trabalho para ilustrar o ciclo 12x36 (12h trabalho / 36h descanso)
             dias = ["Dia 1 (Trabalho)", "Dia 2 (Descanso)", "Dia 3 (Trabalho)", "Dia 4 (Descanso)"]
             
-            # Jornada diária é 12h (720 min)
-            shift_minutes = jornada_padrao_minutos
-
-            for i, dia in enumerate(dias):
-                if "Trabalho" in dia:
-                    saida, intervalo_str, jornada_diaria_str = calculate_exit_time(
-                        entrada, 
-                        intervalo_minutos, 
-                        shift_minutes
-                    )
-                    descanso = "36h (Fixa 12x36)"
-                    entrada_disp = entrada.strftime("%H:%M")
-                else:
-                    saida = "-"
-                    intervalo_str = "-"
-                    jornada_diaria_str = "00h 00m"
-                    descanso = "Em Descanso 36h"
-                    entrada_disp = "-"
-                
-                data.append({
-                    "Dia": dia,
-                    "Entrada": entrada_disp,
-                    "Intervalo": intervalo_str,
-                    "Saída": saida,
-                    "Jornada Diária (Líquida)": jornada_diaria_str,
-                    "Descanso Após Jornada": descanso
-                })
+            # Jornada diária é 12h (720 min), a mesma em todos os dias de trabalho
+            shift_units = jornada_padrao_minutos * UNIDADES_MINUTO_DIURNO
+
+            try:
+                saida, intervalo_str, jornada_diaria_str = calculate_exit_time(
+                    entrada, 
+                    intervalo_minutos, 
+                    shift_units
+                )
+            except ValueError as e:
+                st.error(f"Ocorreu um erro no cálculo: {e}")
+                return
+
+            # Dias de trabalho recebem o turno calculado; dias de descanso ficam vazios
+            trabalho = ["Trabalho" in dia for dia in dias]
+            data = {
+                "Dia": dias,
+                "Entrada": [entrada_disp if t else "-" for t in trabalho],
+                "Intervalo": [intervalo_str if t else "-" for t in trabalho],
+                "Saída": [saida if t else "-" for t in trabalho],
+                "Jornada Diária (Líquida)": [jornada_diaria_str if t else "00h 00m" for t in trabalho],
+                "Descanso Após Jornada": ["36h (Fixa 12x36)" if t else "Em Descanso 36h" for t in trabalho]
+            }
 
         # --- Exibição de Resultados ---
-        df = pd.DataFrame(data)
-        
         st.subheader("🗓️ Resumo da Jornada Detalhada")
-        st.dataframe(df, use_container_width=True, hide_index=True)
+        # O Streamlit aceita o dict de colunas diretamente, sem pandas
+        st.dataframe(data, use_container_width=True, hide_index=True)
 
         # --- Resumo Mensal ---
         st.subheader("📊 Resumo Mensal e Legal")
         
-        if regime_trabalho == "Regime 12x36":
-            total_semanal_str = "Aprox. 42h00m"
-            total_mensal_horas_clt = 180 
-            col1_caption = "A jornada média semanal é de 42h, considerando 3.5 turnos de 12h."
-            col2_caption = "Valor de referência para cálculo de salário (CLT: 180h/mês)."
-            col3_caption = "Média aproximada de dias TRABALHADOS no mês."
-        else:
-            # Padrão Semanal e Short Friday
-            total_semanal_str = format_timedelta(timedelta(minutes=total_semanal_minutos_target))
-            # Cálculo baseado em semanas comerciais (aprox. 5 semanas/mês)
-            total_mensal_horas_clt = round(total_semanal_minutos_target / 60 * 5)
-            
-            col1_caption = f"Jornada informada pelo usuário. Limite legal é de 44 horas."
-            col2_caption = f"Referência CLT: {total_mensal_horas_clt}h/mês (5 semanas x {total_semanal_str})."
-            col3_caption = f"Dias de trabalho por semana: {dias_trabalho_semana}."
+        total_semanal_str, total_mensal_horas_clt, col1_caption, col2_caption, col3_caption = build_monthly_summary(
+            regime_trabalho, 
+            total_semanal_minutos_target, 
+            dias_trabalho_semana
+        )
         
         col1, col2, col3 = st.columns(3)
         
@@ -500,13 +581,7 @@ def main():
             st.caption(col3_caption)
             
 
-        st.markdown("""
-        ---
-        ### ⚠️ Nota sobre Hora Noturna Reduzida
-        A jornada de saída é calculada de forma dinâmica. Se o horário de trabalho (líquido) se estender para o período entre **22:00 e 05:00**, a cada **52 minutos e 30 segundos** reais de trabalho é contabilizado **1 hora** na contagem da jornada (**Hora Ficta**).
-        
-        * **Intervalo:** O horário de intervalo é inserido na simulação após o acúmulo de 4 horas de trabalho efetivo.
-        """)
+        st.markdown(_NOTA_HORA_NOTURNA)
         
 
 if __name__ == "__main__":